@@ -0,0 +1,351 @@
+# Docling conversion code that runs inside app.py's converter pool. Every spawned worker imports
+# this module, so keep it free of import-time side effects (no FastAPI app, Supabase client, pool).
+
+import hashlib
+import io
+import logging
+import os
+from typing import Optional
+
+import orjson
+
+
+def env_float(name: str, default_value: float, min_value: float, max_value: float) -> float:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return max(min_value, min(default_value, max_value))
+    try:
+        value = float(raw)
+    except ValueError:
+        return max(min_value, min(default_value, max_value))
+    return max(min_value, min(value, max_value))
+
+
+def env_int(name: str, default_value: int, min_value: int, max_value: int) -> int:
+    raw = (os.getenv(name) or "").strip()
+    if not raw:
+        return max(min_value, min(default_value, max_value))
+    try:
+        value = int(raw)
+    except ValueError:
+        return max(min_value, min(default_value, max_value))
+    return max(min_value, min(value, max_value))
+
+
+def _uses_tuned_pdf_converter(suffix: str) -> bool:
+    if suffix.lower() != ".pdf":
+        return False
+    pdf_mode = (os.getenv("DOCLING_PDF_CONVERTER_MODE") or "default").strip().lower()
+    # Preserve the original PDF behavior unless the conservative path is explicitly requested.
+    return pdf_mode in {"conservative", "tuned"}
+
+
+def _build_docling_converter(suffix: str, include_images: bool):
+    # Import Docling lazily so the server can start with low memory.
+    from docling.datamodel.base_models import InputFormat
+    from docling.datamodel.pipeline_options import PdfPipelineOptions
+    from docling.document_converter import DocumentConverter, PdfFormatOption
+
+    if not _uses_tuned_pdf_converter(suffix):
+        return DocumentConverter()
+
+    pipeline_options = PdfPipelineOptions()
+    pipeline_options.do_ocr = False
+    pipeline_options.do_picture_classification = False
+    pipeline_options.do_picture_description = False
+    pipeline_options.generate_page_images = include_images
+    pipeline_options.generate_picture_images = include_images
+    if include_images and hasattr(pipeline_options, "images_scale"):
+        pipeline_options.images_scale = env_float("DOCLING_IMAGE_SCALE", 1.5, 1.0, 4.0)
+
+    if hasattr(pipeline_options, "generate_table_images"):
+        pipeline_options.generate_table_images = include_images
+    if hasattr(pipeline_options, "generate_parsed_pages"):
+        pipeline_options.generate_parsed_pages = False
+    if hasattr(pipeline_options, "force_backend_text"):
+        pipeline_options.force_backend_text = True
+
+    return DocumentConverter(
+        format_options={
+            InputFormat.PDF: PdfFormatOption(
+                pipeline_options=pipeline_options,
+            )
+        }
+    )
+
+
+# Per-process converter cache. DocumentConverter initializes its pipelines (and models) on first
+# use, so reusing one instance per configuration avoids paying that cost on every request.
+_DOCLING_CONVERTERS: dict[tuple, object] = {}
+
+
+def _get_docling_converter(suffix: str, include_images: bool):
+    key = ("pdf-tuned", include_images) if _uses_tuned_pdf_converter(suffix) else ("default",)
+    converter = _DOCLING_CONVERTERS.get(key)
+    if converter is None:
+        converter = _build_docling_converter(suffix, include_images)
+        _DOCLING_CONVERTERS[key] = converter
+    return converter
+
+
+def init_converter_worker():
+    # Warm the default converter once per pool worker instead of on the first request it serves.
+    # An exception here would break the whole pool, which app.py can't tell apart from a crashed
+    # worker. Log it instead; do_convert retries the build and reports the real error per request.
+    try:
+        _get_docling_converter("", False)
+    except Exception:
+        logging.getLogger(__name__).exception("Failed to initialize Docling in converter worker")
+
+
+def _guess_page_no_from_element(element) -> Optional[int]:
+    prov = getattr(element, "prov", None)
+    if not prov:
+        return None
+    try:
+        first = prov[0]
+    except Exception:
+        return None
+    page_no = getattr(first, "page_no", None)
+    return int(page_no) if page_no is not None else None
+
+
+def _image_to_png_bytes(image) -> tuple[bytes, Optional[int], Optional[int]]:
+    width = int(getattr(image, "width", 0) or 0) or None
+    height = int(getattr(image, "height", 0) or 0) or None
+    pil_image = getattr(image, "pil_image", None) or image
+    buffer = io.BytesIO()
+    pil_image.save(buffer, format="PNG")
+    return buffer.getvalue(), width, height
+
+
+def _aspect_ratio(width: Optional[int], height: Optional[int]) -> Optional[float]:
+    if not width or not height or width <= 0 or height <= 0:
+        return None
+    return width / height
+
+
+def _is_screen_like(width: Optional[int], height: Optional[int]) -> bool:
+    ratio = _aspect_ratio(width, height)
+    if ratio is None:
+        return False
+    area = int(width or 0) * int(height or 0)
+    if area < 180_000:
+        return False
+    return (0.42 <= ratio <= 0.82) or (1.15 <= ratio <= 2.4)
+
+
+def _docling_image_filter_config():
+    return {
+        "min_edge_px": env_int("DOCLING_IMAGE_MIN_EDGE_PX", 220, 64, 4096),
+        "min_area_px": env_int("DOCLING_IMAGE_MIN_AREA_PX", 90_000, 16_384, 20_000_000),
+        "banner_ratio": env_float("DOCLING_IMAGE_BANNER_RATIO", 3.8, 2.0, 12.0),
+        "banner_max_height_px": env_int("DOCLING_IMAGE_BANNER_MAX_HEIGHT_PX", 720, 64, 4096),
+        "logo_max_area_px": env_int("DOCLING_IMAGE_LOGO_MAX_AREA_PX", 420_000, 16_384, 5_000_000),
+        "logo_max_edge_px": env_int("DOCLING_IMAGE_LOGO_MAX_EDGE_PX", 700, 64, 4096),
+        "max_page_no": env_int("DOCLING_IMAGE_MAX_PAGE_NO", 4, 1, 50),
+        "duplicate_dims_limit_non_screen": env_int("DOCLING_IMAGE_DUPLICATE_DIMS_LIMIT_NON_SCREEN", 2, 1, 20),
+        "duplicate_dims_limit_screen": env_int("DOCLING_IMAGE_DUPLICATE_DIMS_LIMIT_SCREEN", 8, 1, 50),
+    }
+
+
+def _should_keep_docling_image(
+    *,
+    kind: str,
+    page_no: Optional[int],
+    width: Optional[int],
+    height: Optional[int],
+    image_bytes: bytes,
+    seen_hashes: set[str],
+    seen_dimension_counts: dict[tuple[str, int, int], int],
+    config: dict[str, int | float],
+) -> tuple[bool, str]:
+    width = int(width or 0) or None
+    height = int(height or 0) or None
+    area = (width or 0) * (height or 0)
+    shortest_edge = min(width or 0, height or 0)
+    longest_edge = max(width or 0, height or 0)
+    ratio = _aspect_ratio(width, height)
+    screen_like = _is_screen_like(width, height)
+    image_hash = hashlib.sha256(image_bytes).hexdigest()[:24]
+
+    if image_hash in seen_hashes:
+        return False, "duplicate_hash"
+
+    if kind == "page" and page_no and page_no > int(config["max_page_no"]):
+        return False, "page_after_limit"
+
+    if shortest_edge and shortest_edge < int(config["min_edge_px"]):
+        return False, "too_small"
+
+    if area and area < int(config["min_area_px"]):
+        return False, "too_small"
+
+    if ratio and ratio >= float(config["banner_ratio"]) and (height or 0) <= int(config["banner_max_height_px"]):
+        return False, "banner_like"
+
+    if kind != "page" and ratio and 0.75 <= ratio <= 1.33 and area and area <= int(config["logo_max_area_px"]) and longest_edge <= int(config["logo_max_edge_px"]):
+        return False, "logo_like"
+
+    if width and height:
+        dims_key = (kind, width, height)
+        dims_limit = int(config["duplicate_dims_limit_screen"] if screen_like else config["duplicate_dims_limit_non_screen"])
+        if seen_dimension_counts.get(dims_key, 0) >= dims_limit:
+            return False, "duplicate_dimensions"
+
+    return True, image_hash
+
+
+def _collect_docling_images(*, conv_res, work_dir: str, user_id: str, job_id: str, stem: str, input_object_path: str):
+    from docling_core.types.doc import PictureItem, TableItem
+
+    uploads = []
+    assets = []
+    skipped_reason_counts = {}
+    assets_prefix = f"docling/{user_id}/out/{job_id}/assets"
+    filter_config = _docling_image_filter_config()
+    seen_hashes = set()
+    seen_dimension_counts = {}
+
+    def maybe_store_image(*, kind: str, index: int, page_no: Optional[int], image, label: str):
+        image_bytes, width, height = _image_to_png_bytes(image)
+        keep, decision = _should_keep_docling_image(
+            kind=kind,
+            page_no=page_no,
+            width=width,
+            height=height,
+            image_bytes=image_bytes,
+            seen_hashes=seen_hashes,
+            seen_dimension_counts=seen_dimension_counts,
+            config=filter_config,
+        )
+        if not keep:
+            skipped_reason_counts[decision] = int(skipped_reason_counts.get(decision, 0)) + 1
+            return
+
+        object_path = f"{assets_prefix}/{kind}s/{stem}-{kind}-{index:03d}.png"
+        if kind == "page":
+            object_path = f"{assets_prefix}/pages/{stem}-page-{index:03d}.png"
+        # Kept images go to disk right away so they don't pile up in memory until upload.
+        file_path = os.path.join(work_dir, f"asset-{len(uploads):04d}.png")
+        with open(file_path, "wb") as f:
+            f.write(image_bytes)
+        uploads.append((object_path, file_path))
+
+        seen_hashes.add(str(decision))
+        if width and height:
+            dims_key = (kind, int(width), int(height))
+            seen_dimension_counts[dims_key] = int(seen_dimension_counts.get(dims_key, 0)) + 1
+
+        assets.append(
+            {
+                "kind": kind,
+                "objectPath": object_path,
+                "pageNo": page_no,
+                "index": index,
+                "width": width,
+                "height": height,
+                "bytes": len(image_bytes),
+                "label": label,
+            }
+        )
+
+    pages = getattr(conv_res.document, "pages", {}) or {}
+    for page_key in sorted(pages.keys()):
+        page = pages[page_key]
+        page_no = int(getattr(page, "page_no", page_key) or page_key)
+        page_image = getattr(page, "image", None)
+        if page_image is None:
+            continue
+        maybe_store_image(kind="page", index=page_no, page_no=page_no, image=page_image, label=f"Page {page_no}")
+
+    picture_counter = 0
+    table_counter = 0
+    for element, _level in conv_res.document.iterate_items():
+        kind = None
+        index = 0
+        if isinstance(element, PictureItem):
+            picture_counter += 1
+            kind = "picture"
+            index = picture_counter
+        elif isinstance(element, TableItem):
+            table_counter += 1
+            kind = "table"
+            index = table_counter
+        else:
+            continue
+
+        try:
+            image = element.get_image(conv_res.document)
+        except Exception:
+            image = None
+        if image is None:
+            continue
+        page_no = _guess_page_no_from_element(element)
+        maybe_store_image(kind=kind, index=index, page_no=page_no, image=image, label=f"{kind.title()} {index}")
+
+    manifest = {
+        "version": 1,
+        "inputObjectPath": input_object_path,
+        "assetsPrefix": assets_prefix,
+        "images": assets,
+        "filtering": {
+            "keptCount": len(assets),
+            "skippedCount": sum(int(v) for v in skipped_reason_counts.values()),
+            "skippedReasonCounts": skipped_reason_counts,
+            "maxPageNo": int(filter_config["max_page_no"]),
+        },
+    }
+    return uploads, manifest
+
+
+def _convert_input_bytes(converter, input_bytes: bytes, suffix: str):
+    from docling.datamodel.base_models import DocumentStream
+
+    return converter.convert(DocumentStream(name=f"input{suffix}", stream=io.BytesIO(input_bytes)))
+
+
+def _write_output_file(document, output_format: str, work_dir: str) -> tuple[str, str]:
+    # Serialize straight to disk so the output never exists as both str and bytes, and only the
+    # file path has to cross back from the worker process.
+    out_path = os.path.join(work_dir, "output")
+    if output_format == "markdown":
+        with open(out_path, "w", encoding="utf-8") as f:
+            f.write(document.export_to_markdown())
+        content_type = "text/markdown; charset=utf-8"
+    else:
+        with open(out_path, "wb") as f:
+            f.write(orjson.dumps(document.export_to_dict(), option=orjson.OPT_NON_STR_KEYS))
+        content_type = "application/json; charset=utf-8"
+    return out_path, content_type
+
+
+def do_convert(
+    work_dir: str,
+    input_bytes: bytes,
+    suffix: str,
+    output_format: str,
+    include_images: bool,
+    user_id: str,
+    job_id: str,
+    stem: str,
+    input_object_path: str,
+):
+    # Runs inside the converter pool, so arguments and the returned tuple must stay picklable.
+    # Output and image assets are written under work_dir, which the caller creates and removes.
+    image_uploads = []
+    image_manifest = None
+    result = _convert_input_bytes(_get_docling_converter(suffix, include_images), input_bytes, suffix)
+
+    if include_images:
+        image_uploads, image_manifest = _collect_docling_images(
+            conv_res=result,
+            work_dir=work_dir,
+            user_id=user_id,
+            job_id=job_id,
+            stem=stem,
+            input_object_path=input_object_path,
+        )
+
+    out_path, content_type = _write_output_file(result.document, output_format, work_dir)
+    return out_path, content_type, image_uploads, image_manifest
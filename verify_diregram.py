@@ -7,7 +7,7 @@ This is a thin wrapper that runs the verifier implementation shipped in this rep
 
 from __future__ import annotations
 
-import runpy
+import importlib.util
 import sys
 from pathlib import Path
 
@@ -21,11 +21,18 @@ def main() -> None:
         raise SystemExit(1)
 
     # If multiple exist, heuristically pick the largest (implementation).
-    impl = sorted(candidates, key=lambda p: p.stat().st_size, reverse=True)[0]
+    impl = max(candidates, key=lambda p: p.stat().st_size)
 
     # Preserve CLI argv while presenting this filename in help/errors.
     sys.argv[0] = self_name
-    runpy.run_path(str(impl), run_name="__main__")
+    spec = importlib.util.spec_from_file_location(impl.stem, impl)
+    if spec is None or spec.loader is None:
+        print(f"FAIL: could not load verifier implementation: {impl.name}")
+        raise SystemExit(1)
+    impl_mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = impl_mod
+    spec.loader.exec_module(impl_mod)
+    impl_mod.main()
 
 
 if __name__ == "__main__":
@@ -17,12 +17,10 @@ Exit codes:
 
 from __future__ import annotations
 
-import json
 import re
 import sys
-from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 REQUIRED_TAG_GROUP_ACTORS = "tg-actors"
@@ -30,54 +28,87 @@ REQUIRED_TAG_GROUP_UI_SURFACE = "tg-uiSurface"
 LEGACY_ACTOR_TITLE_PREFIXES = ("system", "staff", "applicant", "partner")
 
 
-@dataclass(frozen=True)
-class Issue:
-    severity: str  # "error" | "warning"
-    code: str
-    message: str
-
-
 TAGS_RE = re.compile(r"<!--\s*tags:([^>]*)\s*-->")
 EXPID_RE = re.compile(r"<!--\s*expid:(\d+)\s*-->")
 DO_RE = re.compile(r"<!--\s*do:([^>]+)\s*-->")
 DOATTRS_RE = re.compile(r"<!--\s*doattrs:([^>]*)\s*-->")
+HTML_COMMENT_RE = re.compile(r"<!--[\s\S]*?-->")
+WHITESPACE_RE = re.compile(r"\s+")
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+ACTOR_TOKEN_PREFIX_RE = re.compile(r"^actor[-_\s]+")
+ACTOR_ID_PREFIX_RE = re.compile(r"^actor-")
+NODE_ID_RE = re.compile(r"^node-(\d+)$")
+TIMEFRAME_RE = re.compile(
+    r"\b(await|waiting|wait|queued|queue|2-4\s*weeks|weeks?|months?|within\s+one\s+month|mail|postal|partner\s+assessment|assessment|ica)\b",
+    flags=re.I,
+)
 
 OBJECT_NAME_ATTR_ID = "__objectName__"
+TAG_SANITIZE_TABLE = str.maketrans("", "", "\n\r<>")
 
 
-def find_separator_index_outside_fences(lines: List[str]) -> int:
+# Single pass yielding (kind, i, payload): "sep" (first ---), "fence_start" (block type),
+# "fence_end" (block body), or "line" (any other line outside fences).
+def tokenize(lines: Iterable[str]) -> Iterator[Tuple[str, int, str]]:
     in_fence = False
+    seen_sep = False
+    body: List[str] = []
     for i, line in enumerate(lines):
-        if line.strip().startswith("```"):
-            in_fence = not in_fence
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            if in_fence:
+                in_fence = False
+                yield ("fence_end", i, "\n".join(body))
+            else:
+                in_fence = True
+                body = []
+                yield ("fence_start", i, stripped[3:].strip())
+            continue
+        if in_fence:
+            body.append(line)
+            continue
+        if not seen_sep and stripped == "---":
+            seen_sep = True
+            yield ("sep", i, "")
             continue
-        if (not in_fence) and line.strip() == "---":
+        yield ("line", i, line)
+
+
+# Deprecated: main() consumes tokenize() directly; these remain for external callers.
+def find_separator_index_outside_fences(lines: List[str]) -> int:
+    for kind, i, _ in tokenize(lines):
+        if kind == "sep":
             return i
     return -1
 
 
 def scan_unclosed_fences(lines: List[str]) -> Optional[int]:
-    in_fence = False
-    start = 0
-    for i, line in enumerate(lines):
-        if line.strip().startswith("```"):
-            if not in_fence:
-                in_fence = True
-                start = i + 1
-            else:
-                in_fence = False
-    return start if in_fence else None
+    start: Optional[int] = None
+    for kind, i, _ in tokenize(lines):
+        if kind == "fence_start":
+            start = i + 1
+        elif kind == "fence_end":
+            start = None
+    return start
 
 
 def iter_fenced_blocks(text: str) -> Iterable[Tuple[str, str]]:
-    # Best-effort: ```type\n<body>\n```
-    for m in re.finditer(r"```([^\n]*)\n(.*?)\n```", text, flags=re.S):
-        block_type = (m.group(1) or "").strip()
-        body = m.group(2) or ""
-        yield (block_type, body)
+    block_type = ""
+    for kind, _, payload in tokenize(text.split("\n")):
+        if kind == "fence_start":
+            block_type = payload
+        elif kind == "fence_end":
+            yield (block_type, payload)
+
+
+def sanitize_tag_token(token: str) -> str:
+    # basic safety, mirroring app sanitization
+    return token.translate(TAG_SANITIZE_TABLE).replace("--", "").strip()
 
 
 def parse_tag_ids_from_line(line: str) -> List[str]:
+    if "tags:" not in line:
+        return []
     m = TAGS_RE.search(line)
     if not m:
         return []
@@ -87,8 +118,7 @@ def parse_tag_ids_from_line(line: str) -> List[str]:
         tid = part.strip()
         if not tid:
             continue
-        # basic safety, mirroring app sanitization
-        tid = tid.replace("\n", "").replace("\r", "").replace("<", "").replace(">", "").replace("--", "").strip()
+        tid = sanitize_tag_token(tid)
         if tid:
             ids.append(tid)
     # de-dupe preserving order
@@ -103,6 +133,8 @@ def parse_tag_ids_from_line(line: str) -> List[str]:
 
 
 def parse_doattrs_ids_from_line(line: str) -> List[str]:
+    if "doattrs:" not in line:
+        return []
     m = DOATTRS_RE.search(line)
     if not m:
         return []
@@ -114,7 +146,7 @@ def parse_doattrs_ids_from_line(line: str) -> List[str]:
         s = part.strip()
         if not s:
             continue
-        s = s.replace("\n", "").replace("\r", "").replace("<", "").replace(">", "").replace("--", "").strip()
+        s = sanitize_tag_token(s)
         if s:
             ids.append(s[:64])
     # de-dupe preserving order
@@ -128,22 +160,34 @@ def parse_doattrs_ids_from_line(line: str) -> List[str]:
     return out
 
 
+def data_object_attr_ids(obj: Dict[str, Any]) -> set[str]:
+    data = obj.get("data")
+    attrs = data.get("attributes") if isinstance(data, dict) else None
+    if not isinstance(attrs, list):
+        return {OBJECT_NAME_ATTR_ID}
+    return {
+        OBJECT_NAME_ATTR_ID,
+        *(a["id"].strip() for a in attrs if isinstance(a, dict) and isinstance(a.get("id"), str) and a["id"].strip()),
+    }
+
+
 def node_title_for_prefix_checks(raw_line: str) -> str:
     # Remove indentation, HTML comments, and known inline markers.
     s = raw_line.lstrip()
-    s = re.sub(r"<!--[\s\S]*?-->", "", s)
+    if "<!--" in s:
+        s = HTML_COMMENT_RE.sub("", s)
     s = s.replace("#flowtab#", " ").replace("#flow#", " ").replace("#common#", " ")
-    s = re.sub(r"\s+", " ", s).strip()
+    s = WHITESPACE_RE.sub(" ", s).strip()
     return s
 
 
 def normalize_actor_matcher_token(raw: str) -> str:
-    return re.sub(r"[^a-z0-9]+", " ", re.sub(r"^actor[-_\s]+", "", (raw or "").lower())).strip()
+    return NON_ALNUM_RE.sub(" ", ACTOR_TOKEN_PREFIX_RE.sub("", (raw or "").lower())).strip()
 
 
 def actor_match_candidates(tag_id: str, tag_name: str) -> List[str]:
     out: List[str] = []
-    for value in (tag_name, re.sub(r"^actor-", "", tag_id or "")):
+    for value in (tag_name, ACTOR_ID_PREFIX_RE.sub("", tag_id or "")):
         normalized = normalize_actor_matcher_token(value)
         if normalized:
             out.append(normalized)
@@ -160,21 +204,33 @@ def build_actor_title_prefix_re(actor_tags: List[Tuple[str, str]]) -> Optional[r
     return re.compile(rf"^({'|'.join(parts)})\s*:\s*", flags=re.I)
 
 
-def expected_actor_for_lane_label(label: str, actor_tags: List[Tuple[str, str]]) -> Optional[str]:
+ActorLaneMatchers = Tuple[Dict[str, str], List[Tuple[str, str]]]
+
+
+def build_actor_lane_matchers(actor_tags: List[Tuple[str, str]]) -> ActorLaneMatchers:
+    # Normalize every actor candidate once: an exact-match lookup plus (candidate, tag_id)
+    # pairs ordered longest first. First definition wins ties, as before.
+    exact: Dict[str, str] = {}
+    by_length: List[Tuple[str, str]] = []
+    for tag_id, tag_name in actor_tags:
+        for candidate in actor_match_candidates(tag_id, tag_name):
+            exact.setdefault(candidate, tag_id)
+            by_length.append((candidate, tag_id))
+    by_length.sort(key=lambda x: len(x[0]), reverse=True)
+    return exact, by_length
+
+
+def expected_actor_for_lane_label(label: str, matchers: ActorLaneMatchers) -> Optional[str]:
     normalized_label = normalize_actor_matcher_token(label)
     if not normalized_label:
         return None
-    best: Optional[Tuple[str, int]] = None
-    for tag_id, tag_name in actor_tags:
-        for candidate in actor_match_candidates(tag_id, tag_name):
-            exact = normalized_label == candidate
-            overlaps = candidate in normalized_label or normalized_label in candidate
-            if not exact and not overlaps:
-                continue
-            score = (1000 if exact else 0) + len(candidate)
-            if best is None or score > best[1]:
-                best = (tag_id, score)
-    return best[0] if best else None
+    exact, by_length = matchers
+    if normalized_label in exact:
+        return exact[normalized_label]
+    for candidate, tag_id in by_length:
+        if candidate in normalized_label or normalized_label in candidate:
+            return tag_id
+    return None
 
 
 def main() -> None:
@@ -182,33 +238,80 @@ def main() -> None:
         print("Usage: python3 verify_diregram.py /absolute/path/to/file.md")
         raise SystemExit(2)
 
+    # Deferred so usage errors don't pay for it. orjson is optional and parses large blocks faster.
+    import json
+
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+
+    def parse_json(body: str) -> Any:
+        if orjson is not None:
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                # Let stdlib json decide (it also accepts NaN/huge ints) and word the error.
+                pass
+        return json.loads(body)
+
     path = Path(sys.argv[1])
     if not path.exists():
         print(f"FAIL: file not found: {path}")
         raise SystemExit(1)
 
-    raw = path.read_text(encoding="utf-8")
-    text = raw.replace("\r\n", "\n").replace("\r", "\n")
-    lines = text.split("\n")
-
-    issues: List[Issue] = []
-
-    unclosed_start = scan_unclosed_fences(lines)
-    if unclosed_start is not None:
-        issues.append(Issue("error", "UNCLOSED_CODE_BLOCK", f"Unclosed fenced code block starting near line {unclosed_start}."))
-
-    sep = find_separator_index_outside_fences(lines)
-    tree_lines = lines[:sep] if sep != -1 else lines
+    # Universal-newline mode already folds \r\n and \r into \n while reading line by line.
+    lines: List[str] = []
+    last = "\n"
+    with path.open(encoding="utf-8") as f:
+        for last in f:
+            lines.append(last.rstrip("\n"))
+    # Match text.split("\n"): a trailing newline (or an empty file) yields a final empty line,
+    # which swimlane node-<N> indices can point at.
+    if last.endswith("\n"):
+        lines.append("")
+
+    errors: List[str] = []
+    warnings: List[str] = []
+
+    def add_error(code: str, message: str) -> None:
+        errors.append(f"ERROR   {code}: {message}")
+
+    def add_warning(code: str, message: str) -> None:
+        warnings.append(f"WARNING {code}: {message}")
+
+    # One pass collects the tree lines (non-blank, outside fences, before the separator),
+    # the raw fenced blocks, and any fence left open at EOF.
+    tree_entries: List[Tuple[int, str]] = []
+    raw_blocks: List[Tuple[str, str]] = []
+    in_tree = True
+    open_fence_at: Optional[int] = None
+    open_fence_type = ""
+    for kind, i, payload in tokenize(lines):
+        if kind == "line":
+            if in_tree and payload.strip():
+                tree_entries.append((i, payload))
+        elif kind == "fence_start":
+            open_fence_at = i
+            open_fence_type = payload
+        elif kind == "fence_end":
+            open_fence_at = None
+            raw_blocks.append((open_fence_type, payload))
+        elif kind == "sep":
+            in_tree = False
+
+    if open_fence_at is not None:
+        add_error("UNCLOSED_CODE_BLOCK", f"Unclosed fenced code block starting near line {open_fence_at + 1}.")
 
     # Parse metadata blocks (best-effort JSON parse; report errors but keep going)
     blocks: Dict[str, Any] = {}
-    for block_type, body in iter_fenced_blocks(text):
+    for block_type, body in raw_blocks:
         if not block_type:
             continue
         try:
-            blocks[block_type] = json.loads(body)
+            blocks[block_type] = parse_json(body)
         except Exception as e:
-            issues.append(Issue("error", "INVALID_JSON", f"Invalid JSON in ```{block_type}```: {e}"))
+            add_error("INVALID_JSON", f"Invalid JSON in ```{block_type}```: {e}")
 
     tag_store = blocks.get("tag-store")
     tag_id_to_group: Dict[str, str] = {}
@@ -218,22 +321,18 @@ def main() -> None:
         groups = tag_store.get("groups", [])
         tags = tag_store.get("tags", [])
         if isinstance(groups, list):
-            for g in groups:
-                if isinstance(g, dict) and isinstance(g.get("id"), str):
-                    group_ids.add(g["id"])
+            group_ids = {g["id"] for g in groups if isinstance(g, dict) and isinstance(g.get("id"), str)}
         if isinstance(tags, list):
-            for t in tags:
-                if not isinstance(t, dict):
-                    continue
-                tid = t.get("id")
-                gid = t.get("groupId")
-                name = t.get("name")
-                if isinstance(tid, str) and isinstance(gid, str):
-                    tag_id_to_group[tid] = gid
-                    if gid == REQUIRED_TAG_GROUP_ACTORS or tid.startswith("actor-"):
-                        actor_tag_defs.append((tid, name if isinstance(name, str) else tid))
+            valid_tags = [t for t in tags if isinstance(t, dict) and isinstance(t.get("id"), str) and isinstance(t.get("groupId"), str)]
+            tag_id_to_group = {t["id"]: t["groupId"] for t in valid_tags}
+            actor_tag_defs = [
+                (t["id"], t["name"] if isinstance(t.get("name"), str) else t["id"])
+                for t in valid_tags
+                if t["groupId"] == REQUIRED_TAG_GROUP_ACTORS or t["id"].startswith("actor-")
+            ]
 
     actor_prefix_re = build_actor_title_prefix_re(actor_tag_defs)
+    actor_lane_matchers = build_actor_lane_matchers(actor_tag_defs)
 
     # Data objects: build attribute-id lookup for doattrs validation.
     data_objects = blocks.get("data-objects")
@@ -241,118 +340,87 @@ def main() -> None:
     if isinstance(data_objects, dict):
         objs = data_objects.get("objects", [])
         if isinstance(objs, list):
-            for o in objs:
-                if not isinstance(o, dict):
-                    continue
-                doid = o.get("id")
-                if not isinstance(doid, str) or not doid.strip():
-                    continue
-                attrs_set: set[str] = {OBJECT_NAME_ATTR_ID}
-                data = o.get("data")
-                if isinstance(data, dict):
-                    attrs = data.get("attributes")
-                    if isinstance(attrs, list):
-                        for a in attrs:
-                            if not isinstance(a, dict):
-                                continue
-                            aid = a.get("id")
-                            if isinstance(aid, str) and aid.strip():
-                                attrs_set.add(aid.strip())
-                do_to_attr_ids[doid.strip()] = attrs_set
+            do_to_attr_ids = {
+                o["id"].strip(): data_object_attr_ids(o)
+                for o in objs
+                if isinstance(o, dict) and isinstance(o.get("id"), str) and o["id"].strip()
+            }
 
     def ensure_tag_store_present() -> None:
         nonlocal tag_store
         if not isinstance(tag_store, dict):
-            issues.append(Issue("error", "MISSING_TAG_STORE", "Missing ```tag-store``` block (required when using tags and for actor enforcement)."))
+            add_error("MISSING_TAG_STORE", "Missing ```tag-store``` block (required when using tags and for actor enforcement).")
 
-    # Tree scanning (skip fences that accidentally appear in tree region)
-    in_tree_fence = False
+    # Tree scanning (fences that accidentally appear in tree region were skipped by tokenize)
     any_flow = False
     any_expid = False
-    for i, line in enumerate(tree_lines):
-        if line.strip().startswith("```"):
-            in_tree_fence = not in_tree_fence
-            continue
-        if in_tree_fence:
-            continue
-        if not line.strip():
-            continue
-
+    tag_ids_by_line: Dict[int, List[str]] = {}
+    for i, line in tree_entries:
         title = node_title_for_prefix_checks(line)
         actor_prefix_match = actor_prefix_re.match(title) if actor_prefix_re else None
         if actor_prefix_match:
             matched_prefix = actor_prefix_match.group(1)
-            issues.append(
-                Issue(
-                    "error",
-                    "ACTOR_PREFIX_IN_TITLE",
-                    f'Line {i+1} encodes an actor in the title ("{matched_prefix}:"). Use actor tags + swimlanes instead.',
-                )
+            add_error(
+                "ACTOR_PREFIX_IN_TITLE",
+                f'Line {i+1} encodes an actor in the title ("{matched_prefix}:"). Use actor tags + swimlanes instead.',
             )
 
-        tag_ids = parse_tag_ids_from_line(line)
+        # Most tree lines carry no HTML comment; skip the comment regexes for those.
+        has_comment = "<!--" in line
+        tag_ids = parse_tag_ids_from_line(line) if has_comment else []
+        tag_ids_by_line[i] = tag_ids
         if tag_ids:
             ensure_tag_store_present()
             if isinstance(tag_store, dict):
                 for tid in tag_ids:
                     if tid not in tag_id_to_group:
-                        issues.append(Issue("error", "UNKNOWN_TAG_ID", f'Line {i+1} references unknown tag id "{tid}" (not present in tag-store).'))
+                        add_error("UNKNOWN_TAG_ID", f'Line {i+1} references unknown tag id "{tid}" (not present in tag-store).')
 
         if "#flow#" in line:
             any_flow = True
             ensure_tag_store_present()
             if isinstance(tag_store, dict) and REQUIRED_TAG_GROUP_ACTORS not in group_ids:
-                issues.append(Issue("error", "MISSING_REQUIRED_TAG_GROUP", f'tag-store missing required group "{REQUIRED_TAG_GROUP_ACTORS}".'))
+                add_error("MISSING_REQUIRED_TAG_GROUP", f'tag-store missing required group "{REQUIRED_TAG_GROUP_ACTORS}".')
             actor_tags = [tid for tid in tag_ids if tag_id_to_group.get(tid) == REQUIRED_TAG_GROUP_ACTORS or tid.startswith("actor-")]
             if len(actor_tags) == 0:
-                issues.append(Issue("error", "MISSING_ACTOR_TAG", f'Line {i+1} is #flow# but has no actor tag. Add exactly one app-specific actor tag from group "{REQUIRED_TAG_GROUP_ACTORS}".'))
+                add_error("MISSING_ACTOR_TAG", f'Line {i+1} is #flow# but has no actor tag. Add exactly one app-specific actor tag from group "{REQUIRED_TAG_GROUP_ACTORS}".')
             elif len(actor_tags) > 1:
-                issues.append(Issue("error", "MULTIPLE_ACTOR_TAGS", f"Line {i+1} is #flow# but has multiple actor tags: {', '.join(actor_tags)}"))
+                add_error("MULTIPLE_ACTOR_TAGS", f"Line {i+1} is #flow# but has multiple actor tags: {', '.join(actor_tags)}")
+            # Cross-timeframe heuristic (warn): #flow# lines with strong async signals. Like the other
+            # tree checks this only covers node lines; fenced text in the tree region is not scanned.
+            if TIMEFRAME_RE.search(line):
+                add_warning(
+                    "CROSS_TIMEFRAME_SIGNAL",
+                    f"Line {i+1} (#flow#) contains a cross-timeframe/async signal. Non-swimlane #flow# processes should be session-scoped; consider splitting via Flowtab/lifecycle hubs.",
+                )
+
+        if not has_comment:
+            continue
 
         do_m = DO_RE.search(line)
         do_id = (do_m.group(1).strip() if do_m else "")
         doattrs_ids = parse_doattrs_ids_from_line(line)
         if doattrs_ids:
             if not do_id:
-                issues.append(Issue("error", "DOATTRS_WITHOUT_DO", f"Line {i+1} uses <!-- doattrs:... --> but has no <!-- do:... --> on the same line."))
+                add_error("DOATTRS_WITHOUT_DO", f"Line {i+1} uses <!-- doattrs:... --> but has no <!-- do:... --> on the same line.")
             elif do_to_attr_ids:
                 allowed = do_to_attr_ids.get(do_id)
                 if allowed:
                     for aid in doattrs_ids:
                         if aid not in allowed:
-                            issues.append(
-                                Issue(
-                                    "warning",
-                                    "UNKNOWN_DATA_OBJECT_ATTRIBUTE_ID",
-                                    f'Line {i+1} references unknown attribute "{aid}" for data object "{do_id}".',
-                                )
+                            add_warning(
+                                "UNKNOWN_DATA_OBJECT_ATTRIBUTE_ID",
+                                f'Line {i+1} references unknown attribute "{aid}" for data object "{do_id}".',
                             )
 
         if EXPID_RE.search(line):
             any_expid = True
             ensure_tag_store_present()
             if isinstance(tag_store, dict) and REQUIRED_TAG_GROUP_UI_SURFACE not in group_ids:
-                issues.append(Issue("error", "MISSING_REQUIRED_TAG_GROUP", f'tag-store missing required group "{REQUIRED_TAG_GROUP_UI_SURFACE}".'))
+                add_error("MISSING_REQUIRED_TAG_GROUP", f'tag-store missing required group "{REQUIRED_TAG_GROUP_UI_SURFACE}".')
             ui_surface_tags = [tid for tid in tag_ids if tag_id_to_group.get(tid) == REQUIRED_TAG_GROUP_UI_SURFACE]
             if len(ui_surface_tags) == 0:
-                issues.append(Issue("error", "MISSING_UI_SURFACE_TAG", f"Line {i+1} has expid but no ui-surface tag (group {REQUIRED_TAG_GROUP_UI_SURFACE})."))
-
-    # Cross-timeframe heuristic (warn): scan #flow# lines for strong signals.
-    timeframe_re = re.compile(
-        r"\b(await|waiting|wait|queued|queue|2-4\s*weeks|weeks?|months?|within\s+one\s+month|mail|postal|partner\s+assessment|assessment|ica)\b",
-        flags=re.I,
-    )
-    for i, line in enumerate(tree_lines):
-        if "#flow#" not in line:
-            continue
-        if timeframe_re.search(line):
-            issues.append(
-                Issue(
-                    "warning",
-                    "CROSS_TIMEFRAME_SIGNAL",
-                    f"Line {i+1} (#flow#) contains a cross-timeframe/async signal. Non-swimlane #flow# processes should be session-scoped; consider splitting via Flowtab/lifecycle hubs.",
-                )
-            )
+                add_error("MISSING_UI_SURFACE_TAG", f"Line {i+1} has expid but no ui-surface tag (group {REQUIRED_TAG_GROUP_UI_SURFACE}).")
 
     # Validate expanded-metadata-* and expanded-grid-* attribute links against data-objects (best-effort).
     if do_to_attr_ids:
@@ -362,18 +430,15 @@ def main() -> None:
                 attrs = data.get("dataObjectAttributeIds")
                 if isinstance(attrs, list) and len(attrs) > 0:
                     if not isinstance(doid, str) or not doid.strip():
-                        issues.append(Issue("error", "DOATTRS_WITHOUT_DO", f"```{block_type}``` includes dataObjectAttributeIds but has no dataObjectId."))
+                        add_error("DOATTRS_WITHOUT_DO", f"```{block_type}``` includes dataObjectAttributeIds but has no dataObjectId.")
                         continue
                     allowed = do_to_attr_ids.get(doid.strip())
                     if allowed:
                         for aid in attrs:
                             if isinstance(aid, str) and aid.strip() and aid.strip() not in allowed:
-                                issues.append(
-                                    Issue(
-                                        "warning",
-                                        "UNKNOWN_DATA_OBJECT_ATTRIBUTE_ID",
-                                        f'```{block_type}``` references unknown attribute "{aid.strip()}" for data object "{doid.strip()}".',
-                                    )
+                                add_warning(
+                                    "UNKNOWN_DATA_OBJECT_ATTRIBUTE_ID",
+                                    f'```{block_type}``` references unknown attribute "{aid.strip()}" for data object "{doid.strip()}".',
                                 )
             if block_type.startswith("expanded-grid-") and isinstance(data, list):
                 for idx, n in enumerate(data):
@@ -383,27 +448,22 @@ def main() -> None:
                     attrs = n.get("dataObjectAttributeIds")
                     if isinstance(attrs, list) and len(attrs) > 0:
                         if not isinstance(doid, str) or not doid.strip():
-                            issues.append(
-                                Issue(
-                                    "error",
-                                    "DOATTRS_WITHOUT_DO",
-                                    f"```{block_type}``` grid node #{idx+1} includes dataObjectAttributeIds but has no dataObjectId.",
-                                )
+                            add_error(
+                                "DOATTRS_WITHOUT_DO",
+                                f"```{block_type}``` grid node #{idx+1} includes dataObjectAttributeIds but has no dataObjectId.",
                             )
                             continue
                         allowed = do_to_attr_ids.get(doid.strip())
                         if allowed:
                             for aid in attrs:
                                 if isinstance(aid, str) and aid.strip() and aid.strip() not in allowed:
-                                    issues.append(
-                                        Issue(
-                                            "warning",
-                                            "UNKNOWN_DATA_OBJECT_ATTRIBUTE_ID",
-                                            f'```{block_type}``` grid node #{idx+1} references unknown attribute "{aid.strip()}" for data object "{doid.strip()}".',
-                                        )
+                                    add_warning(
+                                        "UNKNOWN_DATA_OBJECT_ATTRIBUTE_ID",
+                                        f'```{block_type}``` grid node #{idx+1} references unknown attribute "{aid.strip()}" for data object "{doid.strip()}".',
                                     )
 
     # Swimlane alignment (warn): if lane label clearly implies actor, compare to node actor tag.
+    expected_actor_by_label: Dict[str, Optional[str]] = {}
     for block_type, data in blocks.items():
         if not block_type.startswith("flowtab-swimlane-"):
             continue
@@ -424,35 +484,34 @@ def main() -> None:
                 if not isinstance(lane_id, str):
                     continue
                 label = lane_label_by_id.get(lane_id, "")
-                expected = expected_actor_for_lane_label(label, actor_tag_defs)
+                if label not in expected_actor_by_label:
+                    expected_actor_by_label[label] = expected_actor_for_lane_label(label, actor_lane_matchers)
+                expected = expected_actor_by_label[label]
                 if not expected:
                     continue
-                m = re.match(r"^node-(\d+)$", node_id)
+                m = NODE_ID_RE.match(node_id)
                 if not m:
                     continue
                 li = int(m.group(1))
                 if li < 0 or li >= len(lines):
                     continue
-                line = lines[li]
-                actor_tags = [tid for tid in parse_tag_ids_from_line(line) if tag_id_to_group.get(tid) == REQUIRED_TAG_GROUP_ACTORS or tid.startswith("actor-")]
+                line_tag_ids = tag_ids_by_line.get(li)
+                if line_tag_ids is None:
+                    line_tag_ids = parse_tag_ids_from_line(lines[li])
+                actor_tags = [tid for tid in line_tag_ids if tag_id_to_group.get(tid) == REQUIRED_TAG_GROUP_ACTORS or tid.startswith("actor-")]
                 if not actor_tags:
-                    issues.append(Issue("warning", "SWIMLANE_NODE_MISSING_ACTOR_TAG", f'{block_type} places {node_id} in lane "{label}" but node has no actor tag.'))
+                    add_warning("SWIMLANE_NODE_MISSING_ACTOR_TAG", f'{block_type} places {node_id} in lane "{label}" but node has no actor tag.')
                 elif len(actor_tags) == 1 and actor_tags[0] != expected:
-                    issues.append(
-                        Issue(
-                            "warning",
-                            "SWIMLANE_ACTOR_MISMATCH",
-                            f'{block_type} places {node_id} in lane "{label}" (implies {expected}) but node actor tag is "{actor_tags[0]}".',
-                        )
+                    add_warning(
+                        "SWIMLANE_ACTOR_MISMATCH",
+                        f'{block_type} places {node_id} in lane "{label}" (implies {expected}) but node actor tag is "{actor_tags[0]}".',
                     )
 
     # Summary
-    err = [x for x in issues if x.severity == "error"]
-    warn = [x for x in issues if x.severity == "warning"]
-    for x in err + warn:
-        print(f"{x.severity.upper():7} {x.code}: {x.message}")
-    print(f"\nSummary: errors={len(err)}, warnings={len(warn)}")
-    raise SystemExit(1 if err else 0)
+    for entry in errors + warnings:
+        print(entry)
+    print(f"\nSummary: errors={len(errors)}, warnings={len(warnings)}")
+    raise SystemExit(1 if errors else 0)
 
 
 if __name__ == "__main__":